@@ -8,7 +8,6 @@ import asyncio
 import json
 import logging
 import os
-import re
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -17,13 +16,14 @@ from anthropic import AsyncAnthropic, APIError
 from fastapi import FastAPI, Response
 from pydantic import BaseModel, Field
 
-from agent_tools import TOOL_DEFINITIONS, execute_tool
+from agent_tools import TOOL_DEFINITIONS, execute_tool, sandbox_relative_path
 from formatter import (
     DEFAULT_TOKEN_BUDGET,
     format_payload,
     read_context_file,
     validate_payload,
 )
+from snapshot import RUN_ID_PATTERN
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -212,27 +212,46 @@ _IDLE_STATE: dict[str, Any] = {
 
 _current_run: dict[str, Any] = {**_IDLE_STATE}
 
+# (run state, public status view) — see _status_view()
+_status_cache: tuple[dict[str, Any], dict[str, Any]] | None = None
+
 # Internal state for clarification resume — kept separate from _current_run
 # so it's never accidentally serialized or exposed via the status API.
 _pending_clarification: dict[str, str] = {}
 
 
+def _status_view() -> dict[str, Any]:
+    """Return the public (camelCase) status view of _current_run.
+
+    _current_run is never mutated in place — every update rebinds it to a
+    new dict — so the view is rebuilt only when that identity changes and
+    status polls between updates reuse the cached dict. Callers must not
+    mutate the returned dict.
+    """
+    global _status_cache
+    run = _current_run
+    if _status_cache is None or _status_cache[0] is not run:
+        _status_cache = (run, {
+            "status": run["status"],
+            "filesChanged": run["files_changed"],
+            "message": run["message"],
+            "turns": run["turns"],
+            "timestamp": run["timestamp"],
+            "error": run["error"],
+            "clarification": run["clarification"],
+            "progress": run["progress"],
+            "plan": run["plan"],
+            "run_id": run.get("run_id"),
+        })
+    return _status_cache[1]
+
+
 def _write_result(output_dir: str) -> None:
     """Write agent-result.json to the .vci directory."""
     try:
         vci_dir = Path(output_dir) / ".vci"
         vci_dir.mkdir(exist_ok=True)
-        result = {
-            "status": _current_run["status"],
-            "filesChanged": _current_run["files_changed"],
-            "message": _current_run["message"],
-            "turns": _current_run["turns"],
-            "timestamp": _current_run["timestamp"],
-            "error": _current_run["error"],
-            "clarification": _current_run["clarification"],
-            "progress": _current_run["progress"],
-            "plan": _current_run["plan"],
-        }
+        result = {k: v for k, v in _status_view().items() if k != "run_id"}
         result_path = vci_dir / "agent-result.json"
         result_path.write_text(json.dumps(result, indent=2), encoding="utf-8")
         logger.info("Wrote agent result to %s", result_path)
@@ -308,7 +327,8 @@ async def _execute_agent_loop(
                 )
 
                 if block.name == "write_file" and not result_text.startswith("Error"):
-                    files_changed.add(block.input.get("path", ""))
+                    path = block.input.get("path", "")
+                    files_changed.add(sandbox_relative_path(path) or path)
 
                 tool_results.append({
                     "type": "tool_result",
@@ -553,21 +573,7 @@ async def trigger_agent(request_body: AgentTriggerRequest):
 @app.get("/agent/status")
 async def agent_status():
     """Return current agent run status."""
-    return {
-        "status": _current_run["status"],
-        "filesChanged": _current_run["files_changed"],
-        "message": _current_run["message"],
-        "turns": _current_run["turns"],
-        "timestamp": _current_run["timestamp"],
-        "error": _current_run["error"],
-        "clarification": _current_run["clarification"],
-        "progress": _current_run["progress"],
-        "plan": _current_run["plan"],
-        "run_id": _current_run.get("run_id"),
-    }
-
-
-_RUN_ID_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2}_[0-9a-f]{6}$")
+    return _status_view()
 
 
 @app.get("/agent/snapshots")
@@ -591,7 +597,7 @@ async def restore_snapshot_endpoint(run_id: str):
 
     from snapshot import restore_snapshot
 
-    if not _RUN_ID_PATTERN.match(run_id):
+    if not RUN_ID_PATTERN.match(run_id):
         return Response(
             content=json.dumps({"error": "Invalid run_id format"}),
             status_code=400,
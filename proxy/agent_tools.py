@@ -9,6 +9,8 @@ import os
 from pathlib import Path
 from typing import Any
 
+from fileio import replace_file
+
 logger = logging.getLogger(__name__)
 
 MAX_READ_SIZE = 1 * 1024 * 1024   # 1MB
@@ -25,6 +27,8 @@ BLOCKED_FILENAMES = frozenset({
 BLOCKED_EXTENSIONS = frozenset({
     ".sh", ".bash", ".zsh", ".exe", ".bat", ".cmd",
 })
+# Tuple form for a single str.endswith() scan over all blocked extensions
+_BLOCKED_EXTENSION_SUFFIXES = tuple(BLOCKED_EXTENSIONS)
 
 # ─── Path Validation ────────────────────────────────────────────────
 
@@ -62,6 +66,19 @@ def _resolve_safe_path(user_path: str) -> tuple[Path | None, str | None]:
     return target, None
 
 
+def sandbox_relative_path(user_path: str) -> str | None:
+    """Return the normalized project-relative form of a sandbox path.
+
+    Collapses ".." segments and in-sandbox symlinks the same way writes
+    do, so snapshots and changed-file lists name the file actually
+    written. Returns None if the path is rejected by the sandbox.
+    """
+    target, error = _resolve_safe_path(user_path)
+    if error:
+        return None
+    return target.relative_to(_get_base_dir()).as_posix()
+
+
 # ─── Tool Definitions (for Claude API) ──────────────────────────────
 
 TOOL_DEFINITIONS: list[dict[str, Any]] = [
@@ -170,11 +187,13 @@ def execute_write_file(path: str, content: str, write_count: int, run_id: str |
         return f"Error: Maximum write limit reached ({MAX_WRITES_PER_RUN} files per run)"
 
     # Block writes to sensitive files
-    filename = Path(path).name.lower()
+    name = Path(path).name
+    filename = name.lower()
     if filename in BLOCKED_FILENAMES:
         return f"Error: Writing to {filename} is not allowed"
-    if Path(path).suffix.lower() in BLOCKED_EXTENSIONS:
-        return f"Error: Writing files with {Path(path).suffix} extension is not allowed"
+    if filename.endswith(_BLOCKED_EXTENSION_SUFFIXES):
+        suffix = name[name.rfind("."):]
+        return f"Error: Writing files with {suffix} extension is not allowed"
 
     target, error = _resolve_safe_path(path)
     if error:
@@ -187,11 +206,12 @@ def execute_write_file(path: str, content: str, write_count: int, run_id: str |
     # Capture snapshot before overwriting (if run_id provided and file exists)
     if run_id and target.is_file():
         from snapshot import capture_file
-        capture_file(str(_get_base_dir()), run_id, path)
+        base = _get_base_dir()
+        capture_file(str(base), run_id, target.relative_to(base).as_posix())
 
     try:
         target.parent.mkdir(parents=True, exist_ok=True)
-        target.write_text(content, encoding="utf-8")
+        replace_file(target, content_bytes)
         return f"Successfully wrote {len(content_bytes):,} bytes to {path}"
     except OSError as exc:
         return f"Error writing file: {exc}"
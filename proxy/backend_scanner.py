@@ -132,9 +132,72 @@ def _find_router_prefix(tree: ast.Module) -> str | None:
     return None
 
 
+# Per-file scan results keyed by (path, rel_path), reused while (mtime_ns, size) match.
+# A None result (unparseable file) is cached too, so broken files are not
+# re-read and re-logged on every scan until they change.
+_file_cache: dict[tuple[Path, str], tuple[int, int, dict[str, Any] | None]] = {}
+
+
+def _scan_file(py_file: Path, rel_path: str) -> dict[str, Any] | None:
+    """Parse one backend file into its routes, models, and database info.
+
+    Returns None if the file cannot be parsed.
+    """
+    try:
+        source = py_file.read_text(encoding="utf-8")
+        tree = ast.parse(source, filename=str(py_file))
+    except (SyntaxError, UnicodeDecodeError) as exc:
+        logger.warning("Failed to parse %s: %s", py_file, exc)
+        return None
+
+    # Extract routes — resolve prefix from APIRouter
+    prefix = _find_router_prefix(tree) or ""
+    routes = _extract_routes(tree, rel_path)
+    if prefix:
+        routes = [
+            {**r, "path": prefix + r["path"]} if not r["path"].startswith(prefix) else r
+            for r in routes
+        ]
+
+    # Look for database URL (sqlite reference)
+    db_info: dict[str, str] | None = None
+    if "create_engine" in source:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                if "sqlite" in node.value:
+                    db_info = {"engine": "sqlite", "url": node.value}
+                    break
+
+    return {
+        "routes": routes,
+        "models": _extract_models(tree, rel_path),
+        "database": db_info,
+    }
+
+
+def _scan_file_cached(py_file: Path, rel_path: str) -> dict[str, Any] | None:
+    """Return the scan for py_file, re-parsing only if it changed on disk."""
+    try:
+        st = py_file.stat()
+    except OSError:
+        return None
+
+    key = (py_file, rel_path)
+    cached = _file_cache.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+
+    result = _scan_file(py_file, rel_path)
+    _file_cache[key] = (st.st_mtime_ns, st.st_size, result)
+    return result
+
+
 def scan_backend(api_dir: str | Path) -> dict[str, Any]:
     """Scan a FastAPI backend directory and return a structured map.
 
+    Files whose mtime and size are unchanged since the previous scan reuse
+    their cached parse, so repeat scans only pay for a stat per file.
+
     Args:
         api_dir: Path to the backend API directory (e.g., 'dummy-target/api')
 
@@ -148,41 +211,28 @@ def scan_backend(api_dir: str | Path) -> dict[str, Any]:
     all_routes: list[dict[str, Any]] = []
     all_models: list[dict[str, Any]] = []
     db_info: dict[str, str] | None = None
+    seen: set[tuple[Path, str]] = set()
 
     for py_file in sorted(api_path.rglob("*.py")):
         if py_file.name.startswith("__"):
             continue
 
-        try:
-            source = py_file.read_text(encoding="utf-8")
-            tree = ast.parse(source, filename=str(py_file))
-        except (SyntaxError, UnicodeDecodeError) as exc:
-            logger.warning("Failed to parse %s: %s", py_file, exc)
-            continue
-
         # Use relative path from api_dir's parent for cleaner references
         rel_path = str(py_file.relative_to(api_path.parent))
+        seen.add((py_file, rel_path))
+
+        scanned = _scan_file_cached(py_file, rel_path)
+        if scanned is None:
+            continue
+
+        all_routes.extend(scanned["routes"])
+        all_models.extend(scanned["models"])
+        if scanned["database"] is not None:
+            db_info = scanned["database"]
 
-        # Extract routes — resolve prefix from APIRouter
-        prefix = _find_router_prefix(tree) or ""
-        routes = _extract_routes(tree, rel_path)
-        if prefix:
-            routes = [
-                {**r, "path": prefix + r["path"]} if not r["path"].startswith(prefix) else r
-                for r in routes
-            ]
-        all_routes.extend(routes)
-
-        # Extract models
-        all_models.extend(_extract_models(tree, rel_path))
-
-        # Look for database URL (sqlite reference)
-        if "create_engine" in source:
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Constant) and isinstance(node.value, str):
-                    if "sqlite" in node.value:
-                        db_info = {"engine": "sqlite", "url": node.value}
-                        break
+    # Forget files under this directory that have since been deleted
+    for key in [k for k in _file_cache if k not in seen and k[0].is_relative_to(api_path)]:
+        del _file_cache[key]
 
     return {
         "endpoints": all_routes,
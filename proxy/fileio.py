@@ -0,0 +1,88 @@
+"""Filesystem helpers shared by the agent tools, source editor, and snapshots."""
+
+import os
+import secrets
+import stat
+
+
+def is_within(root: str | os.PathLike, path: str | os.PathLike) -> bool:
+    """Check that path, with symlinks resolved, stays inside root.
+
+    Args:
+        root: Directory that must contain path.
+        path: File or directory to check; it need not exist yet.
+
+    Returns:
+        True if the real path of path is root or lies below it.
+    """
+    try:
+        real_root = os.path.realpath(root)
+        return os.path.commonpath([real_root, os.path.realpath(path)]) == real_root
+    except (ValueError, OSError):
+        return False
+
+
+def replace_file(path: str | os.PathLike, data: bytes) -> None:
+    """Atomically replace the contents of path with data.
+
+    The data goes to a uniquely named temp file beside the target (created
+    with O_EXCL, so no existing file is ever clobbered) and is swapped in
+    with os.replace, so readers such as the dev server's file watcher never
+    see a partial write. Symlinks are resolved first: the link's target is
+    updated and the link itself is left in place. An existing file's
+    permission bits, owner and group are carried over; when the owner
+    cannot be preserved (the proxy is not privileged to chown) or the file
+    has other hard links, it is rewritten in place instead so it keeps its
+    inode.
+
+    Args:
+        path: File to create or replace.
+        data: The complete new file contents.
+    """
+    target = os.path.realpath(path)
+    try:
+        st = os.stat(target)
+    except FileNotFoundError:
+        st = None
+    if st is not None and st.st_nlink > 1:
+        _write_in_place(target, data)
+        return
+
+    directory, name = os.path.split(target)
+    tmp_path = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if st is not None and not _copy_owner(f.fileno(), st):
+                os.unlink(tmp_path)
+                _write_in_place(target, data)
+                return
+        if st is not None:
+            os.chmod(tmp_path, stat.S_IMODE(st.st_mode))
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _copy_owner(fd: int, st: os.stat_result) -> bool:
+    """Give the open temp file st's owner and group; False if not permitted."""
+    tmp_st = os.fstat(fd)
+    if (tmp_st.st_uid, tmp_st.st_gid) == (st.st_uid, st.st_gid):
+        return True
+    try:
+        os.fchown(fd, st.st_uid, st.st_gid)
+    except PermissionError:
+        return False
+    return True
+
+
+def _write_in_place(target: str, data: bytes) -> None:
+    """Truncate and rewrite target, keeping its inode, owner and links."""
+    with open(target, "wb") as f:
+        f.write(data)
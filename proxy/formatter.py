@@ -7,6 +7,7 @@ using a multi-pass budget strategy to fit within token limits.
 import json
 import logging
 import os
+import stat
 from pathlib import Path
 from typing import Any, Optional
 
@@ -257,6 +258,9 @@ def _build_backend_section(backend_map: dict | None) -> str:
 
 PRELOAD_MAX_LINES = 200
 PRELOAD_TOKEN_BUDGET = 5000
+# A file larger than this can never fit the preload budget, even if every
+# character were a 4-byte UTF-8 sequence, so it is skipped unread.
+PRELOAD_MAX_BYTES = PRELOAD_TOKEN_BUDGET * CHARS_PER_TOKEN * 4
 
 _LANG_MAP = {
     ".py": "python", ".jsx": "jsx", ".tsx": "tsx", ".ts": "typescript",
@@ -264,6 +268,36 @@ _LANG_MAP = {
 }
 
 
+def _read_small_text(path: Path, max_bytes: int) -> str | None:
+    """Read a regular file with one open/fstat/read, or None if too large.
+
+    Returns None for non-regular files and files over max_bytes without
+    reading their contents. The file is opened non-blocking so a FIFO or
+    device named by the payload cannot stall the open itself.
+    """
+    fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode) or st.st_size > max_bytes:
+            return None
+        chunks = []
+        remaining = st.st_size + 1  # +1 detects growth since fstat
+        while remaining > 0:
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+    finally:
+        os.close(fd)
+
+    data = b"".join(chunks)
+    if len(data) > max_bytes:
+        return None
+    # Universal newlines, as read_text() would give
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
 def _build_preloaded_files(
     contexts: list[dict] | None, backend_map: dict | None
 ) -> str:
@@ -306,11 +340,13 @@ def _build_preloaded_files(
     for rel_path in paths:
         try:
             full = (base / rel_path).resolve()
-            if not full.is_relative_to(base) or not full.is_file():
+            if not full.is_relative_to(base):
                 continue
-            content = full.read_text(encoding="utf-8")
+            content = _read_small_text(full, PRELOAD_MAX_BYTES)
         except (OSError, UnicodeDecodeError):
             continue
+        if content is None:
+            continue
 
         lines = content.splitlines()
         if len(lines) > PRELOAD_MAX_LINES:
@@ -1,10 +1,8 @@
 """FastAPI proxy service for Visual Context Interface."""
 
-import asyncio
 import json as json_module
 import logging
 import os
-import re
 from urllib.parse import unquote
 
 from fastapi import FastAPI, Request, Response
@@ -16,14 +14,9 @@ from pydantic import BaseModel, Field, field_validator
 
 from datetime import datetime, timezone
 from injection import inject_inspector_script, rewrite_asset_paths
-from source_editor import (
-    partition_edits,
-    apply_inline_style_edit,
-    apply_css_class_edit,
-    find_css_file,
-    extract_classes_from_selector,
-)
+from source_editor import partition_edits, apply_edits_batch
 from backend_scanner import scan_backend
+from snapshot import RUN_ID_PATTERN
 
 logger = logging.getLogger(__name__)
 
@@ -85,10 +78,9 @@ class AnalyzeImageRequest(BaseModel):
 async def analyze_image_endpoint(request_body: AnalyzeImageRequest):
     """Analyze an image using Claude Vision API."""
     try:
-        from vision import analyze_image
+        from vision import analyze_image_async
 
-        result = await asyncio.to_thread(
-            analyze_image,
+        result = await analyze_image_async(
             request_body.image_data_url,
             request_body.context,
         )
@@ -300,13 +292,10 @@ async def snapshots_proxy():
         return {"snapshots": []}
 
 
-_SNAPSHOT_RUN_ID_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2}_[0-9a-f]{6}$")
-
-
 @app.post("/api/snapshots/{run_id}/restore")
 async def restore_snapshot_proxy(run_id: str):
     """Proxy snapshot restore to agent service."""
-    if not _SNAPSHOT_RUN_ID_PATTERN.match(run_id):
+    if not RUN_ID_PATTERN.match(run_id):
         return Response(
             content=json_module.dumps({"error": "Invalid run_id format"}),
             status_code=400,
@@ -391,42 +380,10 @@ async def apply_edits_endpoint(request_body: ApplyEditsRequest):
     edit_dicts = [e.model_dump(by_alias=True) for e in request_body.edits]
     deterministic, ai_assisted = partition_edits(edit_dicts)
 
-    applied = []
-    for edit in deterministic:
-        source_file = edit.get("sourceFile")
-        source_line = edit.get("sourceLine")
-        unapplied_changes = []
-        for change in edit.get("changes", []):
-            success = apply_inline_style_edit(
-                project_dir,
-                source_file,
-                source_line,
-                change["property"],
-                change["value"],
-            )
-            if not success and source_file:
-                # Fallback: find associated CSS file and edit by class name
-                css_path = find_css_file(project_dir, source_file)
-                if css_path:
-                    classes = extract_classes_from_selector(edit["selector"])
-                    success = apply_css_class_edit(
-                        css_path,
-                        classes,
-                        change["property"],
-                        change["value"],
-                    )
-            if success:
-                applied.append({
-                    "selector": edit["selector"],
-                    "property": change["property"],
-                    "value": change["value"],
-                })
-            else:
-                unapplied_changes.append(change)
+    applied, unapplied = apply_edits_batch(project_dir, deterministic)
 
-        # Route unapplied deterministic edits to AI instead of marking as failed
-        if unapplied_changes:
-            ai_assisted.append({**edit, "changes": unapplied_changes})
+    # Route unapplied deterministic edits to AI instead of marking as failed
+    ai_assisted.extend(unapplied)
 
     return {
         "success": True,
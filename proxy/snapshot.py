@@ -7,18 +7,33 @@ and stores them alongside a manifest describing the run.
 
 from __future__ import annotations
 
-import json
+import errno
 import logging
+import os
+import re
 import secrets
 import shutil
+import time
 from datetime import datetime, timezone
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+
+import orjson
+
+from fileio import is_within, replace_file
 
 logger = logging.getLogger(__name__)
 
 MAX_FULL_SNAPSHOTS = 10
 VALID_FINAL_STATUSES = frozenset({"success", "error"})
 
+# Shape of the names produced by _generate_run_id
+RUN_ID_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2}_[0-9a-f]{6}$")
+
+# Directories already created inside each in-progress snapshot, so repeat
+# captures into the same folder skip the mkdir/stat round trip. Entries
+# are dropped when the run is finalized.
+_run_dirs: dict[str, set[Path]] = {}
+
 
 def _snapshots_dir(output_dir: str) -> Path:
     """Return the .vci/snapshots/ directory for a given output dir."""
@@ -30,22 +45,130 @@ def _snapshot_dir(output_dir: str, run_id: str) -> Path:
     return _snapshots_dir(output_dir) / run_id
 
 
-def _is_safe_relative_path(output_dir: str, relative_path: str) -> bool:
-    """Validate that a relative path stays within the output directory."""
-    base = Path(output_dir).resolve()
-    target = (base / relative_path).resolve()
+def _index_path(snapshots_dir: Path) -> Path:
+    """Return the path of the snapshot index file."""
+    return snapshots_dir / "index.json"
+
+
+def _scan_manifests(snapshots_dir: Path) -> list[dict]:
+    """Read every snapshot manifest on disk, oldest first."""
+    manifests = []
+    for d in snapshots_dir.iterdir():
+        if not d.is_dir():
+            continue
+        manifest_path = d / "manifest.json"
+        if manifest_path.is_file():
+            try:
+                manifests.append(orjson.loads(manifest_path.read_bytes()))
+            except (orjson.JSONDecodeError, OSError):
+                continue
+
+    return sorted(manifests, key=lambda m: m.get("run_id", ""))
+
+
+def _load_index(snapshots_dir: Path) -> list[dict]:
+    """Load the snapshot index, rebuilding it from manifests if missing.
+
+    The index mirrors every run's manifest so listing snapshots is a
+    single file read instead of one read per run directory.
+    """
+    index_path = _index_path(snapshots_dir)
     try:
-        target.relative_to(base)
-        return True
-    except ValueError:
-        return False
+        entries = orjson.loads(index_path.read_bytes())
+        if isinstance(entries, list):
+            return entries
+    except FileNotFoundError:
+        pass
+    except (orjson.JSONDecodeError, OSError):
+        logger.warning("Snapshot index unreadable, rebuilding: %s", index_path)
+
+    entries = _scan_manifests(snapshots_dir)
+    try:
+        _write_json(index_path, entries)
+    except OSError as exc:
+        # Listing must keep working on a read-only snapshots directory
+        logger.warning("Could not write snapshot index %s: %s", index_path, exc)
+    return entries
+
+
+def _update_index(snapshots_dir: Path, manifests: list[dict]) -> None:
+    """Insert or replace index entries for the given manifests."""
+    entries = _load_index(snapshots_dir)
+    by_run_id = {entry.get("run_id"): i for i, entry in enumerate(entries)}
+
+    for manifest in manifests:
+        position = by_run_id.get(manifest["run_id"])
+        if position is None:
+            by_run_id[manifest["run_id"]] = len(entries)
+            entries.append(manifest)
+        else:
+            entries[position] = manifest
+
+    _write_json(_index_path(snapshots_dir), entries)
+
+
+def _is_safe_relative_path(relative_path: str) -> bool:
+    """Validate that a relative path stays within the output directory.
+
+    Purely lexical, so no filesystem calls: the path must be non-empty,
+    relative, and free of ".." segments. Callers pass normalized paths
+    (agent_tools hands capture_file the resolved, project-relative form);
+    restore_snapshot also checks the resolved destination, since symlinks
+    may have changed since the run.
+    """
+    parts = PurePosixPath(relative_path).parts
+    return bool(parts) and parts[0] != "/" and ".." not in parts
+
+
+def _write_json(path: Path, data: dict | list) -> None:
+    """Atomically write data as indented JSON to path."""
+    replace_file(path, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
+def _copy_file(source: Path, dest: Path) -> None:
+    """Copy file contents and metadata from source to dest.
+
+    Uses os.copy_file_range so the kernel moves the data (or reflinks it on
+    filesystems that support it) without bouncing it through userspace.
+    Falls back to shutil.copyfile where the syscall is unavailable or the
+    copy crosses filesystems.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            _copy_file_range(source, dest)
+            shutil.copystat(str(source), str(dest))
+            return
+        except OSError as exc:
+            if exc.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+
+    shutil.copyfile(str(source), str(dest))
+    shutil.copystat(str(source), str(dest))
+
+
+def _copy_file_range(source: Path, dest: Path) -> None:
+    """Copy source to dest with os.copy_file_range in 1MB chunks."""
+    src_fd = os.open(source, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while os.copy_file_range(src_fd, dst_fd, 1 << 20):
+                pass
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+
+def _now() -> float:
+    """Return the current epoch time in seconds (indirection point for tests)."""
+    return time.time()
 
 
 def _generate_run_id() -> str:
     """Generate a unique run ID based on UTC timestamp with random suffix."""
-    now = datetime.now(timezone.utc)
-    suffix = secrets.token_hex(3)  # 6 hex chars
-    return f"{now.strftime('%Y-%m-%dT%H-%M-%S')}_{suffix}"
+    stamp = time.strftime("%Y-%m-%dT%H-%M-%S", time.gmtime(_now()))
+    return stamp + "_" + secrets.token_hex(3)  # 6 hex chars
 
 
 def init_snapshot(output_dir: str) -> str:
@@ -59,7 +182,8 @@ def init_snapshot(output_dir: str) -> str:
     """
     run_id = _generate_run_id()
     snap_dir = _snapshot_dir(output_dir, run_id)
-    snap_dir.mkdir(parents=True, exist_ok=True)
+    os.makedirs(snap_dir, exist_ok=True)
+    _run_dirs[run_id] = {snap_dir}
 
     manifest = {
         "run_id": run_id,
@@ -67,7 +191,8 @@ def init_snapshot(output_dir: str) -> str:
         "files": [],
     }
     manifest_path = snap_dir / "manifest.json"
-    manifest_path.write_text(json.dumps(manifest, indent=2))
+    _write_json(manifest_path, manifest)
+    _update_index(_snapshots_dir(output_dir), [manifest])
 
     return run_id
 
@@ -84,7 +209,7 @@ def capture_file(output_dir: str, run_id: str, relative_path: str) -> bool:
         True if the file was captured, False if it was skipped
         (nonexistent or path traversal).
     """
-    if not _is_safe_relative_path(output_dir, relative_path):
+    if not _is_safe_relative_path(relative_path):
         return False
 
     source = Path(output_dir) / relative_path
@@ -93,8 +218,15 @@ def capture_file(output_dir: str, run_id: str, relative_path: str) -> bool:
 
     snap_dir = _snapshot_dir(output_dir, run_id)
     dest = snap_dir / relative_path
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(str(source), str(dest))
+    if dest.exists():
+        # Already captured earlier in this run; keep the pre-run contents
+        return True
+
+    created = _run_dirs.setdefault(run_id, set())
+    if dest.parent not in created:
+        os.makedirs(dest.parent, exist_ok=True)
+        created.add(dest.parent)
+    _copy_file(source, dest)
 
     return True
 
@@ -119,6 +251,7 @@ def finalize_snapshot(
         logger.warning("Invalid finalize status '%s', defaulting to 'error'", status)
         status = "error"
 
+    _run_dirs.pop(run_id, None)
     snap_dir = _snapshot_dir(output_dir, run_id)
     manifest_path = snap_dir / "manifest.json"
 
@@ -126,42 +259,55 @@ def finalize_snapshot(
         logger.warning("Snapshot manifest not found for run_id=%s", run_id)
         return
 
-    manifest = json.loads(manifest_path.read_text())
+    manifest = orjson.loads(manifest_path.read_bytes())
     updated_manifest = {
         **manifest,
         "status": status,
         "files": list(files_changed),
         "context_summary": context_summary,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": datetime.fromtimestamp(_now(), timezone.utc).isoformat(),
     }
-    manifest_path.write_text(json.dumps(updated_manifest, indent=2))
+    _write_json(manifest_path, updated_manifest)
 
-    latest_path = _snapshots_dir(output_dir) / "latest.json"
+    snapshots_dir = _snapshots_dir(output_dir)
+    latest_path = snapshots_dir / "latest.json"
     latest = {"run_id": run_id}
-    latest_path.write_text(json.dumps(latest, indent=2))
+    _write_json(latest_path, latest)
 
-    _prune_snapshots(_snapshots_dir(output_dir))
+    pruned = _prune_snapshots(snapshots_dir)
+    _update_index(snapshots_dir, [updated_manifest, *pruned])
 
 
-def _prune_snapshots(snapshots_dir: Path) -> None:
+def _prune_snapshots(snapshots_dir: Path) -> list[dict]:
     """Keep only the last MAX_FULL_SNAPSHOTS full snapshots.
 
     Older snapshots are reduced to manifest-only (all captured files
     are deleted) and the manifest status is set to "pruned".
+
+    Returns:
+        The manifests that were pruned by this call.
     """
-    snapshot_dirs = sorted(
-        [
-            d
-            for d in snapshots_dir.iterdir()
-            if d.is_dir() and (d / "manifest.json").is_file()
-        ],
-        key=lambda d: d.name,
-        reverse=True,
-    )
-
-    for old_dir in snapshot_dirs[MAX_FULL_SNAPSHOTS:]:
+    # run_ids start with a UTC timestamp, so name order is creation order
+    # and no per-directory stat is needed to find the oldest runs. Other
+    # directories are ignored so they cannot take one of the keep slots.
+    with os.scandir(snapshots_dir) as it:
+        run_ids = sorted(
+            (
+                entry.name
+                for entry in it
+                if RUN_ID_PATTERN.match(entry.name) and entry.is_dir(follow_symlinks=False)
+            ),
+            reverse=True,
+        )
+
+    pruned = []
+    for run_id in run_ids[MAX_FULL_SNAPSHOTS:]:
+        old_dir = snapshots_dir / run_id
         manifest_path = old_dir / "manifest.json"
-        manifest = json.loads(manifest_path.read_text())
+        try:
+            manifest = orjson.loads(manifest_path.read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            continue
 
         if manifest.get("status") == "pruned":
             continue
@@ -180,7 +326,10 @@ def _prune_snapshots(snapshots_dir: Path) -> None:
                     pass
 
         pruned_manifest = {**manifest, "status": "pruned"}
-        manifest_path.write_text(json.dumps(pruned_manifest, indent=2))
+        _write_json(manifest_path, pruned_manifest)
+        pruned.append(pruned_manifest)
+
+    return pruned
 
 
 def list_snapshots(output_dir: str) -> list[dict]:
@@ -196,19 +345,8 @@ def list_snapshots(output_dir: str) -> list[dict]:
     if not snapshots_path.is_dir():
         return []
 
-    manifests = []
-    for d in snapshots_path.iterdir():
-        if not d.is_dir():
-            continue
-        manifest_path = d / "manifest.json"
-        if manifest_path.is_file():
-            try:
-                manifest = json.loads(manifest_path.read_text())
-                manifests.append(manifest)
-            except (json.JSONDecodeError, OSError):
-                continue
-
-    return sorted(manifests, key=lambda m: m.get("run_id", ""), reverse=True)
+    entries = _load_index(snapshots_path)
+    return sorted(entries, key=lambda m: m.get("run_id", ""), reverse=True)
 
 
 def restore_snapshot(output_dir: str, run_id: str) -> list[str] | None:
@@ -228,7 +366,7 @@ def restore_snapshot(output_dir: str, run_id: str) -> list[str] | None:
     if not manifest_path.is_file():
         return None
 
-    manifest = json.loads(manifest_path.read_text())
+    manifest = orjson.loads(manifest_path.read_bytes())
 
     if manifest.get("status") == "pruned":
         return None
@@ -237,7 +375,7 @@ def restore_snapshot(output_dir: str, run_id: str) -> list[str] | None:
     base = Path(output_dir)
 
     for rel_path_str in manifest.get("files", []):
-        if not _is_safe_relative_path(output_dir, rel_path_str):
+        if not _is_safe_relative_path(rel_path_str):
             continue
 
         snapshot_file = snap_dir / rel_path_str
@@ -245,8 +383,11 @@ def restore_snapshot(output_dir: str, run_id: str) -> list[str] | None:
             continue
 
         dest = base / rel_path_str
+        if not is_within(base, dest):
+            logger.warning("Skipping restore outside output dir: %s", rel_path_str)
+            continue
         dest.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(str(snapshot_file), str(dest))
+        _copy_file(snapshot_file, dest)
         restored_files.append(rel_path_str)
 
     return restored_files
@@ -1,11 +1,18 @@
 """Deterministic source file editor for simple CSS property changes."""
 
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, TypeVar
+
+from fileio import is_within, replace_file
+
+_T = TypeVar("_T")
 
 # CSS properties that can be safely edited deterministically
-DETERMINISTIC_PROPERTIES = {
+DETERMINISTIC_PROPERTIES = frozenset({
     "color", "backgroundColor", "background-color",
     "borderColor", "border-color",
     "fontSize", "font-size",
@@ -26,14 +33,20 @@ DETERMINISTIC_PROPERTIES = {
     "flexDirection", "flex-direction",
     "alignItems", "align-items",
     "justifyContent", "justify-content",
-}
+})
 
-AI_ONLY_PROPERTIES = {"textContent"}
+AI_ONLY_PROPERTIES = frozenset({"textContent"})
 
 # Characters that could break out of CSS/JSX value contexts
 _DANGEROUS_CSS_CHARS = frozenset(";{}()<>`\\")
 _MAX_CSS_VALUE_LENGTH = 200
 
+_SELECTOR_CLASS_RE = re.compile(r"\.([a-zA-Z_][\w-]*)")
+
+_MAX_IO_WORKERS = 8
+
+_STYLESHEET_EXTENSIONS = (".css", ".scss", ".module.css", ".module.scss")
+
 
 def validate_css_value(value: str) -> tuple[bool, str]:
     """Validate a CSS property value is safe to write into source files.
@@ -64,42 +77,76 @@ def partition_edits(edits: list[dict[str, Any]]) -> tuple[list[dict], list[dict]
     """
     deterministic = []
     ai_assisted = []
+    # Local bindings keep the per-change loop on LOAD_FAST lookups
+    add_deterministic = deterministic.append
+    add_ai_assisted = ai_assisted.append
+    deterministic_props = DETERMINISTIC_PROPERTIES
 
     for edit in edits:
         has_source = (
             edit.get("sourceFile") is not None
             and edit.get("sourceLine") is not None
         )
+        changes = edit.get("changes", [])
+
+        if not has_source:
+            # Nothing can be written directly without a source location
+            if changes:
+                add_ai_assisted({**edit, "changes": list(changes)})
+            continue
+
         det_changes = []
         ai_changes = []
 
-        for change in edit.get("changes", []):
-            prop = change.get("property", "")
-            if has_source and prop in DETERMINISTIC_PROPERTIES:
+        for change in changes:
+            if change.get("property", "") in deterministic_props:
                 det_changes.append(change)
             else:
                 ai_changes.append(change)
 
         if det_changes:
-            deterministic.append({**edit, "changes": det_changes})
+            add_deterministic({**edit, "changes": det_changes})
         if ai_changes:
-            ai_assisted.append({**edit, "changes": ai_changes})
+            add_ai_assisted({**edit, "changes": ai_changes})
 
     return deterministic, ai_assisted
 
 
+@lru_cache(maxsize=256)
 def camel_to_kebab(name: str) -> str:
     """Convert camelCase CSS property to kebab-case."""
-    return re.sub(r"([A-Z])", r"-\1", name).lower()
+    out: list[str] = []
+    for ch in name:
+        if ch.isupper():
+            out.append("-")
+            out.append(ch.lower())
+        else:
+            out.append(ch)
+    return "".join(out)
 
 
-def _is_safe_path(project_dir: Path, file_path: Path) -> bool:
-    """Check that resolved path stays within the project directory."""
-    try:
-        resolved = file_path.resolve()
-        return str(resolved).startswith(str(project_dir.resolve()))
-    except (ValueError, OSError):
-        return False
+def _safe_join(project_dir: str | Path, source_file: str) -> str | None:
+    """Join source_file onto project_dir, or None if it escapes the project.
+
+    Absolute paths and ".." segments are rejected lexically before any
+    realpath() syscall; the remaining paths are checked for symlink escapes.
+    """
+    parts = source_file.replace("\\", "/").split("/")
+    if ".." in parts or os.path.isabs(source_file):
+        return None
+    full = os.path.join(os.fspath(project_dir), source_file)
+    return full if is_within(project_dir, full) else None
+
+
+def _read_source(path: str | Path) -> str:
+    """Read a source file as UTF-8 in one read, keeping its line endings."""
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8")
+
+
+def _write_source(path: str | Path, content: str) -> None:
+    """Atomically replace a source file (or its symlink target) with content."""
+    replace_file(path, content.encode("utf-8"))
 
 
 def find_css_file(project_dir: Path, source_file: str) -> Path | None:
@@ -107,14 +154,13 @@ def find_css_file(project_dir: Path, source_file: str) -> Path | None:
 
     Tries common naming conventions: Home.jsx -> Home.css, Home.module.css, etc.
     """
-    jsx_path = project_dir / source_file
-    stem = jsx_path.stem
-    parent = jsx_path.parent
+    jsx_path = os.path.join(os.fspath(project_dir), source_file)
+    base = os.path.splitext(jsx_path)[0]
 
-    for ext in [".css", ".scss", ".module.css", ".module.scss"]:
-        css_path = parent / f"{stem}{ext}"
-        if css_path.is_file() and _is_safe_path(project_dir, css_path):
-            return css_path
+    for ext in _STYLESHEET_EXTENSIONS:
+        css_path = base + ext
+        if os.path.isfile(css_path) and is_within(project_dir, css_path):
+            return Path(css_path)
 
     return None
 
@@ -125,44 +171,57 @@ def extract_classes_from_selector(selector: str) -> list[str]:
     '#root > div.app > main.main > section.hero:nth-child(1)' -> ['app', 'main', 'hero']
     Returns classes in reverse order (most specific first).
     """
-    classes = re.findall(r"\.([a-zA-Z_][\w-]*)", selector)
-    return list(reversed(classes))
+    classes = _SELECTOR_CLASS_RE.findall(selector)
+    classes.reverse()
+    return classes
 
 
-def apply_inline_style_edit(
-    project_dir: Path,
-    source_file: str,
+@lru_cache(maxsize=128)
+def _inline_style_re(property_name: str) -> re.Pattern[str]:
+    """Compiled pattern for `property: 'value'` in a JSX style object."""
+    return re.compile(
+        rf"""({re.escape(property_name)}\s*:\s*)(['"])([^'"]*)\2"""
+    )
+
+
+@lru_cache(maxsize=256)
+def _css_property_re(class_name: str, kebab_prop: str) -> re.Pattern[str]:
+    """Compiled pattern for .className { ... kebab-prop: value; ... }."""
+    return re.compile(
+        rf"(\.{re.escape(class_name)}\s*\{{[^}}]*?)"
+        rf"({re.escape(kebab_prop)}\s*:\s*)([^;]+)"
+        rf"(;[^}}]*\}})",
+        re.DOTALL,
+    )
+
+
+@lru_cache(maxsize=128)
+def _css_rule_re(class_name: str) -> re.Pattern[str]:
+    """Compiled pattern for a .className { ... } rule up to its closing brace."""
+    return re.compile(
+        rf"(\.{re.escape(class_name)}\s*\{{[^}}]*?)"
+        rf"(\}})",
+        re.DOTALL,
+    )
+
+
+def _edit_inline_style(
+    content: str,
     source_line: int,
     property_name: str,
     new_value: str,
-) -> bool:
-    """Apply a CSS property change to an inline style object in a JSX file.
+) -> str | None:
+    """Return content with an inline style property near source_line updated.
 
-    Looks for `property: 'value'` or `property: "value"` patterns near the source line.
-    Returns True if the edit was applied.
+    Returns None if no `property: 'value'` pattern is found in the window.
     """
-    is_valid, _ = validate_css_value(new_value)
-    if not is_valid:
-        return False
-
-    file_path = project_dir / source_file
-    if not file_path.is_file():
-        return False
-
-    if not _is_safe_path(project_dir, file_path):
-        return False
-
-    content = file_path.read_text()
     lines = content.split("\n")
 
     line_idx = source_line - 1
     search_start = max(0, line_idx - 5)
     search_end = min(len(lines), line_idx + 15)
 
-    camel_prop = property_name
-    pattern = re.compile(
-        rf"""({re.escape(camel_prop)}\s*:\s*)(['"])([^'"]*)\2"""
-    )
+    pattern = _inline_style_re(property_name)
 
     for i in range(search_start, search_end):
         match = pattern.search(lines[i])
@@ -172,61 +231,36 @@ def apply_inline_style_edit(
                 + f"{match.group(1)}'{new_value}'"
                 + lines[i][match.end():]
             )
-            file_path.write_text("\n".join(lines))
-            return True
+            return "\n".join(lines)
 
-    return False
+    return None
 
 
-def apply_css_class_edit(
-    css_file_path: Path,
+def _edit_css_class(
+    content: str,
     classes: list[str],
     property_name: str,
     new_value: str,
-) -> bool:
-    """Apply a CSS property change in a CSS file by matching class selectors.
+) -> str | None:
+    """Return CSS content with property_name set in the first matching class rule.
 
-    Tries each class name from the element, looking for a rule that contains
-    the target property. Updates the value if found, or adds the property
-    to the first matching rule block if not.
+    Returns None if none of the classes has a rule block in content.
     """
-    is_valid, _ = validate_css_value(new_value)
-    if not is_valid:
-        return False
-
-    if not css_file_path.is_file():
-        return False
-
-    content = css_file_path.read_text()
     kebab_prop = camel_to_kebab(property_name)
 
     for class_name in classes:
-        # Match .className { ... kebab-prop: value; ... }
-        update_pattern = re.compile(
-            rf"(\.{re.escape(class_name)}\s*\{{[^}}]*?)"
-            rf"({re.escape(kebab_prop)}\s*:\s*)([^;]+)"
-            rf"(;[^}}]*\}})",
-            re.DOTALL,
-        )
-        match = update_pattern.search(content)
+        match = _css_property_re(class_name, kebab_prop).search(content)
         if match:
-            new_content = (
+            return (
                 content[:match.start()]
                 + match.group(1)
                 + f"{kebab_prop}: {new_value}"
                 + match.group(4)
                 + content[match.end():]
             )
-            css_file_path.write_text(new_content)
-            return True
 
         # Property not in the rule — try to add it before the closing brace
-        add_pattern = re.compile(
-            rf"(\.{re.escape(class_name)}\s*\{{[^}}]*?)"
-            rf"(\}})",
-            re.DOTALL,
-        )
-        add_match = add_pattern.search(content)
+        add_match = _css_rule_re(class_name).search(content)
         if add_match:
             block_before = add_match.group(1).rstrip()
             # Detect indentation from existing content
@@ -237,14 +271,187 @@ def apply_css_class_edit(
                 leading = re.match(r"^(\s+)", last_prop_line)
                 if leading:
                     indent = leading.group(1)
-            new_content = (
+            return (
                 content[:add_match.start()]
                 + block_before + "\n"
                 + f"{indent}{kebab_prop}: {new_value};\n"
                 + add_match.group(2)
                 + content[add_match.end():]
             )
-            css_file_path.write_text(new_content)
-            return True
 
-    return False
+    return None
+
+
+def apply_inline_style_edit(
+    project_dir: Path,
+    source_file: str,
+    source_line: int,
+    property_name: str,
+    new_value: str,
+) -> bool:
+    """Apply a CSS property change to an inline style object in a JSX file.
+
+    Looks for `property: 'value'` or `property: "value"` patterns near the source line.
+    Returns True if the edit was applied.
+    """
+    is_valid, _ = validate_css_value(new_value)
+    if not is_valid:
+        return False
+
+    file_path = _safe_join(project_dir, source_file)
+    if file_path is None or not os.path.isfile(file_path):
+        return False
+
+    new_content = _edit_inline_style(
+        _read_source(file_path), source_line, property_name, new_value
+    )
+    if new_content is None:
+        return False
+
+    _write_source(file_path, new_content)
+    return True
+
+
+def apply_css_class_edit(
+    css_file_path: Path,
+    classes: list[str],
+    property_name: str,
+    new_value: str,
+) -> bool:
+    """Apply a CSS property change in a CSS file by matching class selectors.
+
+    Tries each class name from the element, looking for a rule that contains
+    the target property. Updates the value if found, or adds the property
+    to the first matching rule block if not.
+    """
+    is_valid, _ = validate_css_value(new_value)
+    if not is_valid:
+        return False
+
+    if not css_file_path.is_file():
+        return False
+
+    new_content = _edit_css_class(
+        _read_source(css_file_path), classes, property_name, new_value
+    )
+    if new_content is None:
+        return False
+
+    _write_source(css_file_path, new_content)
+    return True
+
+
+def apply_edits_batch(
+    project_dir: Path,
+    deterministic_edits: list[dict[str, Any]],
+) -> tuple[list[dict], list[dict]]:
+    """Apply deterministic edits, reading and writing each touched file once.
+
+    Each change is tried as an inline style edit in its source file first,
+    then as a class rule edit in the component's stylesheet — the same order
+    as calling apply_inline_style_edit / apply_css_class_edit per change —
+    but all changes to a file are applied in memory and written together.
+
+    Returns (applied, unapplied) where applied holds
+    {"selector", "property", "value"} records and unapplied holds the
+    edits (with only their failed changes) to route to the agent.
+    """
+    root = os.fspath(project_dir)
+    dirty: dict[str, None] = {}  # insertion-ordered set
+
+    # Files are keyed by realpath so that different spellings of one file
+    # ("src/Home.jsx", "./src/Home.jsx", a symlink) share one in-memory copy.
+    source_paths: list[str | None] = []
+    for edit in deterministic_edits:
+        source_file = edit.get("sourceFile")
+        candidate = _safe_join(root, source_file) if source_file else None
+        if candidate is not None:
+            candidate = os.path.realpath(candidate) if os.path.isfile(candidate) else None
+        source_paths.append(candidate)
+
+    # Source files are independent, so read them concurrently up front;
+    # stylesheets are only needed on fallback and are loaded lazily.
+    unique_sources = list(dict.fromkeys(p for p in source_paths if p is not None))
+    contents: dict[str, str | None] = dict(
+        zip(unique_sources, _map_files(_try_read_source, unique_sources))
+    )
+
+    def load(path: str) -> str | None:
+        if path not in contents:
+            contents[path] = _try_read_source(path)
+        return contents[path]
+
+    applied = []
+    unapplied = []
+
+    for edit, source_path in zip(deterministic_edits, source_paths):
+        source_file = edit.get("sourceFile")
+        source_line = edit.get("sourceLine")
+        css_path = None
+        classes = None
+
+        unapplied_changes = []
+        for change in edit.get("changes", []):
+            prop, value = change["property"], change["value"]
+            success = False
+
+            if validate_css_value(value)[0]:
+                if source_path is not None and load(source_path) is not None:
+                    new_content = _edit_inline_style(
+                        contents[source_path], source_line, prop, value
+                    )
+                    if new_content is not None:
+                        contents[source_path] = new_content
+                        dirty[source_path] = None
+                        success = True
+
+                if not success and source_file:
+                    # Fallback: find associated CSS file and edit by class name
+                    if classes is None:
+                        found = find_css_file(project_dir, source_file)
+                        css_path = os.path.realpath(found) if found else None
+                        classes = extract_classes_from_selector(edit["selector"])
+                    if css_path is not None and load(css_path) is not None:
+                        new_content = _edit_css_class(
+                            contents[css_path], classes, prop, value
+                        )
+                        if new_content is not None:
+                            contents[css_path] = new_content
+                            dirty[css_path] = None
+                            success = True
+
+            if success:
+                applied.append({
+                    "selector": edit["selector"],
+                    "property": prop,
+                    "value": value,
+                })
+            else:
+                unapplied_changes.append(change)
+
+        if unapplied_changes:
+            unapplied.append({**edit, "changes": unapplied_changes})
+
+    _map_files(lambda path: _write_source(path, contents[path]), list(dirty))
+
+    return applied, unapplied
+
+
+def _try_read_source(path: str) -> str | None:
+    """Read a source file, or None if it is unreadable or not UTF-8."""
+    try:
+        return _read_source(path)
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _map_files(fn: Callable[[str], _T], paths: list[str]) -> list[_T]:
+    """Apply fn to each path, overlapping file I/O across threads.
+
+    Single files skip the pool entirely; exceptions propagate as they would
+    from a plain loop.
+    """
+    if len(paths) <= 1:
+        return [fn(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=min(_MAX_IO_WORKERS, len(paths))) as pool:
+        return list(pool.map(fn, paths))
@@ -1,12 +1,32 @@
 """Tests for the proxy service."""
 
 import os
+from types import SimpleNamespace
 from unittest.mock import patch, AsyncMock
 
 import httpx
 import pytest
 from fastapi.testclient import TestClient
 
+# Upstream responses are only read for headers/content/status_code, so a
+# plain namespace stands in for httpx.Response without mock bookkeeping.
+_PLAIN_TEXT_RESPONSE = SimpleNamespace(
+    headers={"content-type": "text/plain"},
+    content=b"hello",
+    status_code=200,
+)
+
+
+@pytest.fixture()
+def upstream_client(monkeypatch):
+    """Route every httpx.AsyncClient the proxy opens to one shared mock."""
+    client = AsyncMock()
+    client.get = AsyncMock(return_value=_PLAIN_TEXT_RESPONSE)
+    client.__aenter__ = AsyncMock(return_value=client)
+    client.__aexit__ = AsyncMock(return_value=False)
+    monkeypatch.setattr(httpx, "AsyncClient", lambda *args, **kwargs: client)
+    return client
+
 
 @pytest.fixture()
 def external_client():
@@ -62,9 +82,8 @@ class TestExternalTargetRouting:
     """When TARGET_HOST is external (e.g. host.docker.internal),
     the proxy should strip the /proxy/ prefix."""
 
-    @patch("main.httpx.AsyncClient")
     @pytest.mark.anyio()
-    async def test_strips_proxy_prefix_for_external_target(self, mock_client_cls):
+    async def test_strips_proxy_prefix_for_external_target(self, upstream_client):
         """External target: /proxy/page → http://host.docker.internal:3000/page"""
         with patch.dict(os.environ, {
             "TARGET_HOST": "host.docker.internal",
@@ -76,23 +95,12 @@ class TestExternalTargetRouting:
 
             assert main._is_external_target is True
 
-            mock_response = AsyncMock()
-            mock_response.headers = {"content-type": "text/plain"}
-            mock_response.content = b"hello"
-            mock_response.status_code = 200
-
-            mock_instance = AsyncMock()
-            mock_instance.get = AsyncMock(return_value=mock_response)
-            mock_instance.__aenter__ = AsyncMock(return_value=mock_instance)
-            mock_instance.__aexit__ = AsyncMock(return_value=False)
-            mock_client_cls.return_value = mock_instance
-
             client = TestClient(main.app)
             response = client.get("/proxy/some/page")
 
             # Verify the proxy called the target WITHOUT /proxy/ prefix
-            mock_instance.get.assert_called_once()
-            called_url = mock_instance.get.call_args[0][0]
+            upstream_client.get.assert_called_once()
+            called_url = upstream_client.get.call_args[0][0]
             assert called_url == "http://host.docker.internal:3000/some/page"
             assert "/proxy/" not in called_url
 
@@ -101,9 +109,8 @@ class TestInternalTargetRouting:
     """When TARGET_HOST is dummy-target or localhost,
     the proxy should keep the /proxy/ prefix."""
 
-    @patch("main.httpx.AsyncClient")
     @pytest.mark.anyio()
-    async def test_keeps_proxy_prefix_for_dummy_target(self, mock_client_cls):
+    async def test_keeps_proxy_prefix_for_dummy_target(self, upstream_client):
         """Internal target: /proxy/page → http://dummy-target:3001/proxy/page"""
         with patch.dict(os.environ, {
             "TARGET_HOST": "dummy-target",
@@ -115,22 +122,11 @@ class TestInternalTargetRouting:
 
             assert main._is_external_target is False
 
-            mock_response = AsyncMock()
-            mock_response.headers = {"content-type": "text/plain"}
-            mock_response.content = b"hello"
-            mock_response.status_code = 200
-
-            mock_instance = AsyncMock()
-            mock_instance.get = AsyncMock(return_value=mock_response)
-            mock_instance.__aenter__ = AsyncMock(return_value=mock_instance)
-            mock_instance.__aexit__ = AsyncMock(return_value=False)
-            mock_client_cls.return_value = mock_instance
-
             client = TestClient(main.app)
             response = client.get("/proxy/some/page")
 
-            mock_instance.get.assert_called_once()
-            called_url = mock_instance.get.call_args[0][0]
+            upstream_client.get.assert_called_once()
+            called_url = upstream_client.get.call_args[0][0]
             assert called_url == "http://dummy-target:3001/proxy/some/page"
 
 
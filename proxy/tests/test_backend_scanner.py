@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+import backend_scanner
+from backend_scanner import scan_backend
+
+
+ROUTES_ONE = (
+    "from fastapi import APIRouter\n"
+    "router = APIRouter()\n"
+    "@router.get('/items')\n"
+    "def list_items(): ...\n"
+)
+
+ROUTES_TWO = ROUTES_ONE + (
+    "@router.post('/items')\n"
+    "def create_item(): ...\n"
+)
+
+
+@pytest.fixture()
+def api_dir(tmp_path, monkeypatch):
+    """A backend directory with an empty per-file scan cache."""
+    monkeypatch.setattr(backend_scanner, "_file_cache", {})
+    api = tmp_path / "api"
+    api.mkdir()
+    return api
+
+
+def _paths(result):
+    return [(e["method"], e["path"]) for e in result["endpoints"]]
+
+
+class TestScanBackendCache:
+    def test_reparses_after_file_changes(self, api_dir):
+        routes = api_dir / "routes.py"
+        routes.write_text(ROUTES_ONE)
+        assert _paths(scan_backend(api_dir)) == [("GET", "/items")]
+
+        routes.write_text(ROUTES_TWO)
+        assert _paths(scan_backend(api_dir)) == [("GET", "/items"), ("POST", "/items")]
+
+    def test_reuses_parse_for_unchanged_file(self, api_dir, monkeypatch):
+        (api_dir / "routes.py").write_text(ROUTES_ONE)
+        scan_backend(api_dir)
+
+        calls = []
+        monkeypatch.setattr(
+            backend_scanner, "_scan_file", lambda *args: calls.append(args)
+        )
+        assert _paths(scan_backend(api_dir)) == [("GET", "/items")]
+        assert calls == []
+
+    def test_warns_once_for_unparseable_file(self, api_dir, caplog):
+        (api_dir / "broken.py").write_text("def broken(:\n")
+
+        with caplog.at_level(logging.WARNING, logger="backend_scanner"):
+            for _ in range(3):
+                assert scan_backend(api_dir)["endpoints"] == []
+
+        warnings = [r for r in caplog.records if "Failed to parse" in r.getMessage()]
+        assert len(warnings) == 1
+
+    def test_recovers_once_file_is_fixed(self, api_dir):
+        broken = api_dir / "routes.py"
+        broken.write_text("def broken(:\n")
+        assert scan_backend(api_dir)["endpoints"] == []
+
+        broken.write_text(ROUTES_ONE)
+        assert _paths(scan_backend(api_dir)) == [("GET", "/items")]
+
+    def test_drops_entries_for_deleted_files(self, api_dir):
+        routes = api_dir / "routes.py"
+        routes.write_text(ROUTES_ONE)
+        scan_backend(api_dir)
+        assert len(backend_scanner._file_cache) == 1
+
+        routes.unlink()
+        assert scan_backend(api_dir)["endpoints"] == []
+        assert backend_scanner._file_cache == {}
@@ -0,0 +1,78 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from fileio import is_within, replace_file
+
+needs_root = pytest.mark.skipif(
+    not hasattr(os, "geteuid") or os.geteuid() != 0, reason="requires root to chown"
+)
+
+
+class TestIsWithin:
+    def test_accepts_nested_path(self, tmp_path):
+        assert is_within(tmp_path, tmp_path / "src" / "App.jsx")
+
+    def test_rejects_sibling_with_shared_prefix(self, tmp_path):
+        (tmp_path / "app").mkdir()
+        assert not is_within(tmp_path / "app", tmp_path / "app-other" / "x")
+
+    def test_rejects_symlink_escape(self, tmp_path):
+        project = tmp_path / "project"
+        project.mkdir()
+        (project / "link").symlink_to(tmp_path)
+        assert not is_within(project, project / "link" / "x")
+
+
+class TestReplaceFile:
+    def test_creates_new_file(self, tmp_path):
+        target = tmp_path / "new.txt"
+        replace_file(target, b"hello")
+        assert target.read_bytes() == b"hello"
+
+    def test_preserves_permission_bits(self, tmp_path):
+        target = tmp_path / "script.sh"
+        target.write_bytes(b"old")
+        target.chmod(0o751)
+        replace_file(target, b"new")
+        assert target.read_bytes() == b"new"
+        assert target.stat().st_mode & 0o777 == 0o751
+
+    @needs_root
+    def test_preserves_owner(self, tmp_path):
+        target = tmp_path / "App.jsx"
+        target.write_bytes(b"old")
+        os.chown(target, 12345, 23456)
+
+        replace_file(target, b"new")
+
+        st = target.stat()
+        assert (st.st_uid, st.st_gid) == (12345, 23456)
+        assert target.read_bytes() == b"new"
+
+    @needs_root
+    def test_writes_in_place_when_owner_cannot_be_kept(self, tmp_path):
+        target = tmp_path / "App.jsx"
+        target.write_bytes(b"old")
+        os.chown(target, 12345, 23456)
+        inode = target.stat().st_ino
+
+        with patch("fileio.os.fchown", side_effect=PermissionError("not permitted")):
+            replace_file(target, b"new")
+
+        st = target.stat()
+        assert st.st_ino == inode
+        assert (st.st_uid, st.st_gid) == (12345, 23456)
+        assert target.read_bytes() == b"new"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["App.jsx"]
+
+    def test_keeps_hard_links(self, tmp_path):
+        target = tmp_path / "App.jsx"
+        target.write_bytes(b"old")
+        alias = tmp_path / "alias.jsx"
+        os.link(target, alias)
+
+        replace_file(target, b"new")
+
+        assert alias.read_bytes() == b"new"
+        assert target.stat().st_ino == alias.stat().st_ino
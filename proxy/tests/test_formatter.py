@@ -2,7 +2,7 @@ import os
 from unittest.mock import patch
 
 import pytest
-from formatter import _build_preloaded_files, _format_edits, _format_element, format_payload
+from formatter import PRELOAD_MAX_BYTES, _build_preloaded_files, _format_edits, _format_element, format_payload
 
 
 class TestFormatEdits:
@@ -110,6 +110,39 @@ class TestBuildPreloadedFiles:
 
         assert result == ""
 
+    def test_skips_files_over_byte_limit(self, tmp_path):
+        big_file = tmp_path / "bundle.js"
+        big_file.write_text("z" * (PRELOAD_MAX_BYTES + 1))
+
+        contexts = [{"sourceFile": "bundle.js", "tagName": "div", "selector": ".x"}]
+
+        with patch.dict(os.environ, {"VCI_OUTPUT_DIR": str(tmp_path)}):
+            result = _build_preloaded_files(contexts, None)
+
+        assert result == ""
+
+    def test_normalizes_crlf_line_endings(self, tmp_path):
+        (tmp_path / "App.jsx").write_bytes(b"line one\r\nline two\rline three\n")
+
+        contexts = [{"sourceFile": "App.jsx", "tagName": "div", "selector": ".x"}]
+
+        with patch.dict(os.environ, {"VCI_OUTPUT_DIR": str(tmp_path)}):
+            result = _build_preloaded_files(contexts, None)
+
+        assert "\r" not in result
+        assert "line one\nline two\nline three" in result
+
+    @pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requires os.mkfifo")
+    def test_skips_fifo_without_blocking(self, tmp_path):
+        os.mkfifo(tmp_path / "pipe.jsx")
+
+        contexts = [{"sourceFile": "pipe.jsx", "tagName": "div", "selector": ".x"}]
+
+        with patch.dict(os.environ, {"VCI_OUTPUT_DIR": str(tmp_path)}):
+            result = _build_preloaded_files(contexts, None)
+
+        assert result == ""
+
     def test_respects_token_budget(self, tmp_path):
         file_a = tmp_path / "a.jsx"
         file_a.write_text("x" * 19000)  # ~4750 tokens, close to 5000 cap
@@ -1,9 +1,12 @@
+import itertools
 import json
 import os
-import time
+from datetime import datetime, timezone
 from unittest.mock import patch
 
+import orjson
 import pytest
+import snapshot
 from snapshot import (
     MAX_FULL_SNAPSHOTS,
     init_snapshot,
@@ -14,15 +17,27 @@ from snapshot import (
 )
 
 
+def _load_json(path):
+    """Parse a JSON file written by the snapshot module."""
+    return orjson.loads(path.read_bytes())
+
+
 @pytest.fixture()
 def snapshot_env(tmp_path):
     """Set up a temporary output directory with .vci/snapshots/."""
     output_dir = tmp_path / "project"
-    output_dir.mkdir()
-    (output_dir / ".vci" / "snapshots").mkdir(parents=True)
+    os.makedirs(output_dir / ".vci" / "snapshots")
     return output_dir
 
 
+@pytest.fixture()
+def fake_clock(monkeypatch):
+    """Advance snapshot's clock one second per call instead of sleeping."""
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp()
+    counter = itertools.count()
+    monkeypatch.setattr(snapshot, "_now", lambda: base + next(counter))
+
+
 class TestInitSnapshot:
     def test_creates_snapshot_directory(self, snapshot_env):
         run_id = init_snapshot(str(snapshot_env))
@@ -32,7 +47,7 @@ class TestInitSnapshot:
     def test_writes_initial_manifest(self, snapshot_env):
         run_id = init_snapshot(str(snapshot_env))
         manifest_path = snapshot_env / ".vci" / "snapshots" / run_id / "manifest.json"
-        manifest = json.loads(manifest_path.read_text())
+        manifest = _load_json(manifest_path)
         assert manifest["run_id"] == run_id
         assert manifest["status"] == "in_progress"
         assert manifest["files"] == []
@@ -81,6 +96,25 @@ class TestCaptureFile:
         captured = capture_file(str(snapshot_env), run_id, "../../etc/passwd")
         assert captured is False
 
+    def test_rejects_absolute_path(self, snapshot_env):
+        run_id = init_snapshot(str(snapshot_env))
+        captured = capture_file(str(snapshot_env), run_id, "/etc/passwd")
+        assert captured is False
+
+    def test_keeps_first_capture_within_run(self, snapshot_env):
+        src = snapshot_env / "src" / "App.jsx"
+        src.parent.mkdir(parents=True)
+        src.write_text("original content")
+
+        run_id = init_snapshot(str(snapshot_env))
+        capture_file(str(snapshot_env), run_id, "src/App.jsx")
+        src.write_text("intermediate content")
+        captured = capture_file(str(snapshot_env), run_id, "src/App.jsx")
+
+        assert captured is True
+        snapshot_copy = snapshot_env / ".vci" / "snapshots" / run_id / "src" / "App.jsx"
+        assert snapshot_copy.read_text() == "original content"
+
 
 class TestFinalizeSnapshot:
     def test_updates_manifest_on_success(self, snapshot_env):
@@ -99,7 +133,7 @@ class TestFinalizeSnapshot:
         )
 
         manifest_path = snapshot_env / ".vci" / "snapshots" / run_id / "manifest.json"
-        manifest = json.loads(manifest_path.read_text())
+        manifest = _load_json(manifest_path)
         assert manifest["status"] == "success"
         assert manifest["files"] == ["src/App.jsx"]
         assert manifest["context_summary"] == "Fix button color"
@@ -109,7 +143,7 @@ class TestFinalizeSnapshot:
         finalize_snapshot(str(snapshot_env), run_id, [], "", "success")
 
         latest_path = snapshot_env / ".vci" / "snapshots" / "latest.json"
-        latest = json.loads(latest_path.read_text())
+        latest = _load_json(latest_path)
         assert latest["run_id"] == run_id
 
     def test_marks_error_status(self, snapshot_env):
@@ -117,29 +151,37 @@ class TestFinalizeSnapshot:
         finalize_snapshot(str(snapshot_env), run_id, [], "", "error")
 
         manifest_path = snapshot_env / ".vci" / "snapshots" / run_id / "manifest.json"
-        manifest = json.loads(manifest_path.read_text())
+        manifest = _load_json(manifest_path)
         assert manifest["status"] == "error"
 
 
+def _create_snapshots(snapshot_env, count):
+    """Create count finalized snapshots, each capturing one file.
+
+    Runs sequentially: init_snapshot/finalize_snapshot update the shared
+    index and prune older runs, so they are not safe to call concurrently.
+    """
+    run_ids = []
+    for i in range(count):
+        rid = init_snapshot(str(snapshot_env))
+        src = snapshot_env / f"file_{i}.txt"
+        src.write_text(f"content {i}")
+        capture_file(str(snapshot_env), rid, f"file_{i}.txt")
+        finalize_snapshot(
+            str(snapshot_env),
+            rid,
+            [f"file_{i}.txt"],
+            f"change {i}",
+            "success",
+        )
+        run_ids.append(rid)
+    return run_ids
+
+
 class TestPruneSnapshots:
-    def test_prunes_beyond_max(self, snapshot_env):
+    def test_prunes_beyond_max(self, snapshot_env, fake_clock):
         total = MAX_FULL_SNAPSHOTS + 2
-        run_ids = []
-
-        for i in range(total):
-            time.sleep(0.01)
-            rid = init_snapshot(str(snapshot_env))
-            src = snapshot_env / f"file_{i}.txt"
-            src.write_text(f"content {i}")
-            capture_file(str(snapshot_env), rid, f"file_{i}.txt")
-            finalize_snapshot(
-                str(snapshot_env),
-                rid,
-                [f"file_{i}.txt"],
-                f"change {i}",
-                "success",
-            )
-            run_ids.append(rid)
+        _create_snapshots(snapshot_env, total)
 
         snapshots = list_snapshots(str(snapshot_env))
         statuses = [s["status"] for s in snapshots]
@@ -150,24 +192,9 @@ class TestPruneSnapshots:
         assert pruned_count == 2
         assert success_count == MAX_FULL_SNAPSHOTS
 
-    def test_pruned_manifest_preserved(self, snapshot_env):
+    def test_pruned_manifest_preserved(self, snapshot_env, fake_clock):
         total = MAX_FULL_SNAPSHOTS + 1
-        run_ids = []
-
-        for i in range(total):
-            time.sleep(0.01)
-            rid = init_snapshot(str(snapshot_env))
-            src = snapshot_env / f"file_{i}.txt"
-            src.write_text(f"content {i}")
-            capture_file(str(snapshot_env), rid, f"file_{i}.txt")
-            finalize_snapshot(
-                str(snapshot_env),
-                rid,
-                [f"file_{i}.txt"],
-                f"change {i}",
-                "success",
-            )
-            run_ids.append(rid)
+        run_ids = _create_snapshots(snapshot_env, total)
 
         snapshots = list_snapshots(str(snapshot_env))
         pruned = [s for s in snapshots if s["status"] == "pruned"]
@@ -185,7 +212,7 @@ class TestPruneSnapshots:
         assert manifest_path.is_file()
 
         # Manifest should show status as "pruned" and still appear in list
-        manifest = json.loads(manifest_path.read_text())
+        manifest = _load_json(manifest_path)
         assert manifest["status"] == "pruned"
 
         # Captured files should be removed from the pruned snapshot
@@ -193,6 +220,13 @@ class TestPruneSnapshots:
         remaining_files = [f for f in snap_dir.rglob("*") if f.is_file()]
         assert all(f.name == "manifest.json" for f in remaining_files)
 
+    def test_ignores_stray_directories(self, snapshot_env, fake_clock):
+        (snapshot_env / ".vci" / "snapshots" / "tmp").mkdir()
+        _create_snapshots(snapshot_env, MAX_FULL_SNAPSHOTS)
+
+        statuses = [s["status"] for s in list_snapshots(str(snapshot_env))]
+        assert statuses == ["success"] * MAX_FULL_SNAPSHOTS
+
 
 class TestRestoreSnapshot:
     def test_restores_files_to_original_location(self, snapshot_env):
@@ -227,7 +261,7 @@ class TestRestoreSnapshot:
         manifest_path = (
             snapshot_env / ".vci" / "snapshots" / run_id / "manifest.json"
         )
-        manifest = json.loads(manifest_path.read_text())
+        manifest = _load_json(manifest_path)
         pruned_manifest = {**manifest, "status": "pruned"}
         manifest_path.write_text(json.dumps(pruned_manifest, indent=2))
 
@@ -238,14 +272,51 @@ class TestRestoreSnapshot:
         result = restore_snapshot(str(snapshot_env), "2099-01-01T00-00-00_abcdef")
         assert result is None
 
+    def test_restores_agent_write_through_dotdot_path(self, snapshot_env):
+        from agent_tools import execute_write_file, sandbox_relative_path
+
+        src = snapshot_env / "src" / "App.jsx"
+        (snapshot_env / "src" / "components").mkdir(parents=True)
+        src.write_text("original content")
+
+        with patch.dict(os.environ, {"VCI_OUTPUT_DIR": str(snapshot_env)}):
+            run_id = init_snapshot(str(snapshot_env))
+            result = execute_write_file("src/components/../App.jsx", "agent content", 0, run_id)
+            changed = sandbox_relative_path("src/components/../App.jsx")
+
+        assert result.startswith("Successfully")
+        assert changed == "src/App.jsx"
+        finalize_snapshot(str(snapshot_env), run_id, [changed], "edit App", "success")
+
+        restored = restore_snapshot(str(snapshot_env), run_id)
+        assert restored == ["src/App.jsx"]
+        assert src.read_text() == "original content"
+
+    def test_skips_destination_behind_new_symlink(self, snapshot_env, tmp_path):
+        link_dir = snapshot_env / "link"
+        link_dir.mkdir()
+        (link_dir / "x.txt").write_text("original content")
+
+        run_id = init_snapshot(str(snapshot_env))
+        capture_file(str(snapshot_env), run_id, "link/x.txt")
+        finalize_snapshot(str(snapshot_env), run_id, ["link/x.txt"], "edit x", "success")
+
+        # Swap the captured directory for a symlink pointing outside the project
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (link_dir / "x.txt").unlink()
+        link_dir.rmdir()
+        link_dir.symlink_to(outside)
+
+        restored = restore_snapshot(str(snapshot_env), run_id)
+        assert restored == []
+        assert not (outside / "x.txt").exists()
+
 
 class TestListSnapshots:
-    def test_returns_newest_first(self, snapshot_env):
+    def test_returns_newest_first(self, snapshot_env, fake_clock):
         summaries = []
         for i in range(3):
-            # Sleep 1 second to guarantee distinct second-level timestamps,
-            # since run_id sorting is by timestamp prefix + random hex suffix.
-            time.sleep(1)
             rid = init_snapshot(str(snapshot_env))
             summary = f"change {i}"
             finalize_snapshot(str(snapshot_env), rid, [], summary, "success")
@@ -262,6 +333,40 @@ class TestListSnapshots:
         result = list_snapshots(str(snapshot_env))
         assert result == []
 
+    def test_round_trips_non_ascii_summary(self, snapshot_env):
+        rid = init_snapshot(str(snapshot_env))
+        finalize_snapshot(str(snapshot_env), rid, [], "Überschrift → 見出し", "success")
+
+        (snapshot_env / ".vci" / "snapshots" / "index.json").unlink()
+
+        snapshots = list_snapshots(str(snapshot_env))
+        assert snapshots[0]["context_summary"] == "Überschrift → 見出し"
+
+    def test_rebuilds_missing_index(self, snapshot_env):
+        rid = init_snapshot(str(snapshot_env))
+        finalize_snapshot(str(snapshot_env), rid, [], "change", "success")
+
+        index_path = snapshot_env / ".vci" / "snapshots" / "index.json"
+        assert index_path.is_file()
+        index_path.unlink()
+
+        snapshots = list_snapshots(str(snapshot_env))
+        assert [s["run_id"] for s in snapshots] == [rid]
+        assert snapshots[0]["context_summary"] == "change"
+        assert index_path.is_file()
+
+    def test_lists_when_index_cannot_be_written(self, snapshot_env):
+        rid = init_snapshot(str(snapshot_env))
+        finalize_snapshot(str(snapshot_env), rid, [], "change", "success")
+        index_path = snapshot_env / ".vci" / "snapshots" / "index.json"
+        index_path.unlink()
+
+        with patch("snapshot.replace_file", side_effect=PermissionError("read-only")):
+            snapshots = list_snapshots(str(snapshot_env))
+
+        assert [s["run_id"] for s in snapshots] == [rid]
+        assert not index_path.exists()
+
 
 class TestAgentToolsSnapshotIntegration:
     def test_write_file_captures_existing_file(self, snapshot_env):
@@ -1,7 +1,11 @@
 import pytest
 from pathlib import Path
+from unittest.mock import patch
+
+import source_editor
 from source_editor import (
     partition_edits,
+    apply_edits_batch,
     apply_inline_style_edit,
     apply_css_class_edit,
     find_css_file,
@@ -140,6 +144,31 @@ class TestFindCssFile:
         result = find_css_file(tmp_path, "src/Home.jsx")
         assert result is None
 
+    def test_falls_back_after_css_is_removed(self, tmp_path):
+        jsx = tmp_path / "src" / "Home.jsx"
+        css = tmp_path / "src" / "Home.css"
+        scss = tmp_path / "src" / "Home.scss"
+        jsx.parent.mkdir(parents=True)
+        jsx.write_text("")
+        css.write_text("")
+        scss.write_text("")
+        assert find_css_file(tmp_path, "src/Home.jsx") == css
+
+        css.unlink()
+        assert find_css_file(tmp_path, "src/Home.jsx") == scss
+
+    def test_prefers_css_created_after_scss_was_found(self, tmp_path):
+        jsx = tmp_path / "src" / "Home.jsx"
+        css = tmp_path / "src" / "Home.css"
+        scss = tmp_path / "src" / "Home.scss"
+        jsx.parent.mkdir(parents=True)
+        jsx.write_text("")
+        scss.write_text("")
+        assert find_css_file(tmp_path, "src/Home.jsx") == scss
+
+        css.write_text("")
+        assert find_css_file(tmp_path, "src/Home.jsx") == css
+
 
 class TestApplyInlineStyleEdit:
     def test_applies_style_change(self, tmp_path):
@@ -184,6 +213,48 @@ class TestApplyInlineStyleEdit:
         )
         assert result is False
 
+    def test_rejects_symlink_into_sibling_with_shared_prefix(self, tmp_path):
+        project = tmp_path / "app"
+        sibling = tmp_path / "app-other"
+        project.mkdir()
+        sibling.mkdir()
+        (sibling / "Button.tsx").write_text("<b style={{ color: 'black' }} />\n")
+        (project / "shared").symlink_to(sibling)
+
+        result = apply_inline_style_edit(
+            project, "shared/Button.tsx", 1, "color", "red"
+        )
+        assert result is False
+        assert "'black'" in (sibling / "Button.tsx").read_text()
+
+    def test_edits_symlink_target_and_keeps_link(self, tmp_path):
+        shared = tmp_path / "shared" / "Button.tsx"
+        shared.parent.mkdir()
+        shared.write_text("<b style={{ color: 'black' }} />\n")
+        link = tmp_path / "src" / "Button.tsx"
+        link.parent.mkdir()
+        link.symlink_to(Path("..") / "shared" / "Button.tsx")
+
+        result = apply_inline_style_edit(
+            tmp_path, "src/Button.tsx", 1, "color", "red"
+        )
+        assert result is True
+        assert link.is_symlink()
+        assert "'red'" in shared.read_text()
+
+    def test_leaves_unrelated_tmp_file_alone(self, tmp_path):
+        comp = tmp_path / "Button.tsx"
+        comp.write_text("<b style={{ color: 'black' }} />\n")
+        stray = tmp_path / "Button.tsx.tmp"
+        stray.write_text("keep me")
+
+        result = apply_inline_style_edit(
+            tmp_path, "Button.tsx", 1, "color", "red"
+        )
+        assert result is True
+        assert stray.read_text() == "keep me"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["Button.tsx", "Button.tsx.tmp"]
+
 
 class TestApplyCssClassEdit:
     def test_updates_existing_property(self, tmp_path):
@@ -251,3 +322,116 @@ class TestApplyCssClassEdit:
         content = css.read_text()
         # Should use 4-space indentation matching the existing rule
         assert "    font-size: 32px;" in content
+
+
+class TestApplyEditsBatch:
+    def test_batch_apply_same_file_single_write(self, tmp_path):
+        comp = tmp_path / "src" / "Button.tsx"
+        comp.parent.mkdir(parents=True)
+        comp.write_text(
+            "export function Button() {\n"
+            "  return (\n"
+            "    <button style={{ backgroundColor: '#cccccc', fontSize: '14px' }}>\n"
+            "      Click\n"
+            "    </button>\n"
+            "  )\n"
+            "}\n"
+        )
+        edits = [{
+            "selector": ".btn",
+            "sourceFile": "src/Button.tsx",
+            "sourceLine": 3,
+            "changes": [
+                {"property": "backgroundColor", "value": "#0066ff", "original": "#cccccc"},
+                {"property": "fontSize", "value": "16px", "original": "14px"},
+            ],
+        }]
+
+        with patch.object(
+            source_editor, "_write_source", wraps=source_editor._write_source
+        ) as write:
+            applied, unapplied = apply_edits_batch(tmp_path, edits)
+
+        assert write.call_count == 1
+        assert [a["property"] for a in applied] == ["backgroundColor", "fontSize"]
+        assert unapplied == []
+        content = comp.read_text()
+        assert "'#0066ff'" in content
+        assert "'16px'" in content
+
+    def test_merges_edits_to_one_file_under_different_spellings(self, tmp_path):
+        comp = tmp_path / "src" / "Home.jsx"
+        comp.parent.mkdir(parents=True)
+        comp.write_text(
+            "<h1 style={{ color: 'black' }}>Hi</h1>\n"
+            "<p style={{ fontSize: '12px' }}>Body</p>\n"
+        )
+        edits = [
+            {
+                "selector": "h1",
+                "sourceFile": "src/Home.jsx",
+                "sourceLine": 1,
+                "changes": [{"property": "color", "value": "red", "original": "black"}],
+            },
+            {
+                "selector": "p",
+                "sourceFile": "./src/Home.jsx",
+                "sourceLine": 2,
+                "changes": [{"property": "fontSize", "value": "16px", "original": "12px"}],
+            },
+        ]
+
+        with patch.object(
+            source_editor, "_write_source", wraps=source_editor._write_source
+        ) as write:
+            applied, unapplied = apply_edits_batch(tmp_path, edits)
+
+        assert write.call_count == 1
+        assert [a["property"] for a in applied] == ["color", "fontSize"]
+        assert unapplied == []
+        content = comp.read_text()
+        assert "'red'" in content
+        assert "'16px'" in content
+
+    def test_falls_back_to_css_and_returns_unapplied(self, tmp_path):
+        comp = tmp_path / "src" / "Home.jsx"
+        css = tmp_path / "src" / "Home.css"
+        comp.parent.mkdir(parents=True)
+        comp.write_text("export default function Home() { return <section /> }\n")
+        css.write_text(".hero {\n  color: black;\n}\n")
+        edits = [{
+            "selector": "#root > section.hero",
+            "sourceFile": "src/Home.jsx",
+            "sourceLine": 1,
+            "changes": [
+                {"property": "color", "value": "red", "original": "black"},
+                {"property": "fontSize", "value": "bad;value", "original": ""},
+            ],
+        }]
+
+        applied, unapplied = apply_edits_batch(tmp_path, edits)
+
+        assert applied == [{"selector": "#root > section.hero", "property": "color", "value": "red"}]
+        assert len(unapplied) == 1
+        assert unapplied[0]["changes"][0]["property"] == "fontSize"
+        assert "color: red;" in css.read_text()
+
+    def test_batch_parallel_applies_independent_files(self, tmp_path):
+        edits = []
+        for name in ["Alpha", "Beta", "Gamma", "Delta"]:
+            comp = tmp_path / "src" / f"{name}.tsx"
+            comp.parent.mkdir(parents=True, exist_ok=True)
+            comp.write_text(f"<div style={{{{ color: 'black' }}}}>{name}</div>\n")
+            edits.append({
+                "selector": f".{name.lower()}",
+                "sourceFile": f"src/{name}.tsx",
+                "sourceLine": 1,
+                "changes": [{"property": "color", "value": "red", "original": "black"}],
+            })
+
+        applied, unapplied = apply_edits_batch(tmp_path, edits)
+
+        assert [a["selector"] for a in applied] == [".alpha", ".beta", ".gamma", ".delta"]
+        assert unapplied == []
+        for name in ["Alpha", "Beta", "Gamma", "Delta"]:
+            assert "color: 'red'" in (tmp_path / "src" / f"{name}.tsx").read_text()
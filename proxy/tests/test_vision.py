@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from vision import (
+    _cache_get,
+    _cache_key,
+    _cache_lookup,
+    _cache_put,
+    _cache_store,
+    _parse_response,
+    extract_media_type,
+    vision_cache_clear,
+)
+
+
+def _message(text):
+    return SimpleNamespace(stop_reason="end_turn", content=[SimpleNamespace(text=text)])
+
+
+class TestImport:
+    def test_does_not_import_sdk(self):
+        proxy_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, vision; print('anthropic' in sys.modules)"],
+            cwd=proxy_dir, capture_output=True, text=True, check=True,
+        )
+        assert result.stdout.strip() == "False"
+
+
+class TestExtractMediaType:
+    def test_base64_data_url(self):
+        assert extract_media_type("data:image/webp;base64,AAAA") == ("image/webp", "AAAA")
+
+    def test_without_parameters(self):
+        assert extract_media_type("data:image/png,AAAA") == ("image/png", "AAAA")
+
+    def test_keeps_commas_in_payload(self):
+        assert extract_media_type("data:image/png;base64,AA,BB") == ("image/png", "AA,BB")
+
+    def test_rejects_missing_header(self):
+        with pytest.raises(ValueError):
+            extract_media_type("AAAA" * 100)
+
+
+class TestParseResponse:
+    def test_plain_json(self):
+        assert _parse_response(_message('{"a": 1}')) == {"a": 1}
+
+    def test_strips_json_fence(self):
+        assert _parse_response(_message('```json\n{"a": [1, 2]}\n```')) == {"a": [1, 2]}
+
+    def test_strips_inline_fence(self):
+        assert _parse_response(_message('```{"a": 1}```')) == {"a": 1}
+
+    def test_strips_unterminated_fence(self):
+        assert _parse_response(_message('```json\n{"a": 1}')) == {"a": 1}
+
+    def test_keeps_backticks_inside_values(self):
+        assert _parse_response(_message('{"a": "x```y"}')) == {"a": "x```y"}
+
+    def test_rejects_empty_response(self):
+        with pytest.raises(ValueError, match="empty"):
+            _parse_response(_message("  \n"))
+
+    def test_rejects_non_json(self):
+        with pytest.raises(orjson.JSONDecodeError):
+            _parse_response(_message("not json"))
+
+
+class TestAnalysisCache:
+    def setup_method(self):
+        vision_cache_clear()
+
+    def teardown_method(self):
+        vision_cache_clear()
+
+    def test_key_ignores_payload_type(self):
+        assert _cache_key("image/png", "AAAA", "") == _cache_key("image/png", b"AAAA", "")
+
+    def test_key_depends_on_context_and_media_type(self):
+        base = _cache_key("image/png", "AAAA", "")
+        assert _cache_key("image/png", "AAAA", "hero") != base
+        assert _cache_key("image/webp", "AAAA", "") != base
+
+    def test_evicts_least_recently_used(self, monkeypatch):
+        monkeypatch.setattr("vision.VISION_CACHE_SIZE", 2)
+        _cache_put(b"a", {"n": 1})
+        _cache_put(b"b", {"n": 2})
+        assert _cache_get(b"a") == {"n": 1}
+        _cache_put(b"c", {"n": 3})
+        assert _cache_get(b"b") is None
+        assert _cache_get(b"a") == {"n": 1}
+        assert _cache_get(b"c") == {"n": 3}
+
+    def test_lookup_is_disabled_by_toggle(self, monkeypatch):
+        monkeypatch.setattr("vision.VISION_CACHE_ENABLED", False)
+        key, cached = _cache_lookup("image/png", "AAAA", "")
+        assert key is None and cached is None
+        assert _cache_store(key, {"n": 1}) == {"n": 1}
+        assert _cache_get(_cache_key("image/png", "AAAA", "")) is None
+
+    def test_lookup_returns_stored_result(self, monkeypatch):
+        monkeypatch.setattr("vision.VISION_CACHE_ENABLED", True)
+        key, cached = _cache_lookup("image/png", "AAAA", "")
+        assert cached is None
+        _cache_store(key, {"n": 1})
+        assert _cache_lookup("image/png", b"AAAA", "") == (key, {"n": 1})
+
+    def test_clear(self):
+        _cache_put(b"a", {"n": 1})
+        vision_cache_clear()
+        assert _cache_get(b"a") is None
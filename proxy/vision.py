@@ -1,17 +1,34 @@
 """Claude Vision API integration for image analysis."""
 
-import json
+import asyncio
+import hashlib
 import logging
 import os
-from typing import Optional
+import re
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
 
-from anthropic import Anthropic
+import orjson
+
+if TYPE_CHECKING:
+    from anthropic import Anthropic, AsyncAnthropic
 
 logger = logging.getLogger(__name__)
 
 VISION_MODEL = os.getenv("ANTHROPIC_VISION_MODEL", "claude-haiku-4-5-20251001")
 MAX_TOKENS = 1024
 
+# Reuse analyses of identical images (e.g. unchanged frames across hot reloads)
+VISION_CACHE_ENABLED = os.getenv("VISION_CACHE_ENABLED", "0") == "1"
+VISION_CACHE_SIZE = 256
+
+# Upper bound on the "data:<media-type>[;params]," prefix of a data URL
+_MAX_DATA_URL_HEADER = 256
+
+# Markdown code fence around the model's JSON, with optional language tag
+# and a closing fence that may be missing if the output was truncated.
+_FENCE_RE = re.compile(r"\A\s*```(?:[\w-]*[ \t]*\r?\n)?(.*?)(?:```)?\s*\Z", re.DOTALL)
+
 ANALYSIS_SYSTEM_PROMPT = """You are a visual analysis assistant for a web development tool. Analyze the provided image and return a JSON object with these fields:
 
 - "description": A concise 1-2 sentence description of what the image shows
@@ -24,50 +41,113 @@ ANALYSIS_SYSTEM_PROMPT = """You are a visual analysis assistant for a web develo
 
 Return ONLY valid JSON, no markdown fencing, no explanation."""
 
-_client: Optional[Anthropic] = None
+ANALYSIS_USER_PROMPT = "Analyze this image and return the structured JSON."
+
+# The SDK is imported on first use so that importing this module stays cheap
+_client: Optional["Anthropic"] = None
+_async_client: Optional["AsyncAnthropic"] = None
+_analysis_cache: OrderedDict[bytes, dict] = OrderedDict()
+
+
+def _require_api_key() -> str:
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
+    return api_key
 
 
-def get_client() -> Anthropic:
+def get_client() -> "Anthropic":
     """Lazy-initialize the Anthropic client."""
     global _client
     if _client is None:
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
-        _client = Anthropic(api_key=api_key)
+        from anthropic import Anthropic
+
+        _client = Anthropic(api_key=_require_api_key())
     return _client
 
 
-def extract_media_type(data_url: str) -> tuple[str, str]:
-    """Extract media type and base64 data from a data URL.
+def get_async_client() -> "AsyncAnthropic":
+    """Lazy-initialize the async Anthropic client.
 
-    Args:
-        data_url: A data URL like "data:image/webp;base64,AAAA..."
-
-    Returns:
-        Tuple of (media_type, base64_data)
+    Shared across requests so concurrent analyses reuse one connection pool.
     """
-    header, data = data_url.split(",", 1)
-    media_type = header.split(":")[1].split(";")[0]
-    return media_type, data
+    global _async_client
+    if _async_client is None:
+        from anthropic import AsyncAnthropic
 
+        _async_client = AsyncAnthropic(api_key=_require_api_key())
+    return _async_client
 
-def analyze_image(image_data_url: str, context: str = "") -> dict:
-    """Send an image to Claude Vision for analysis.
+
+def _cache_key(media_type: str, base64_data: str | bytes, context: str) -> bytes:
+    if isinstance(base64_data, str):
+        base64_data = base64_data.encode("ascii")
+    digest = hashlib.blake2b(base64_data, digest_size=16)
+    digest.update(b"\0" + media_type.encode() + b"\0" + context.encode())
+    return digest.digest()
+
+
+def _cache_get(key: bytes) -> Optional[dict]:
+    result = _analysis_cache.get(key)
+    if result is not None:
+        _analysis_cache.move_to_end(key)
+    return result
+
+
+def _cache_put(key: bytes, result: dict) -> None:
+    _analysis_cache[key] = result
+    _analysis_cache.move_to_end(key)
+    if len(_analysis_cache) > VISION_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+
+
+def _cache_lookup(
+    media_type: str, base64_data: str | bytes, context: str
+) -> tuple[Optional[bytes], Optional[dict]]:
+    """Return (cache key, cached result); the key is None when caching is off."""
+    if not VISION_CACHE_ENABLED:
+        return None, None
+    key = _cache_key(media_type, base64_data, context)
+    return key, _cache_get(key)
+
+
+def _cache_store(key: Optional[bytes], result: dict) -> dict:
+    """Cache result under key (if caching is on) and return it."""
+    if key is not None:
+        _cache_put(key, result)
+    return result
+
+
+def vision_cache_clear() -> None:
+    """Drop every cached image analysis."""
+    _analysis_cache.clear()
+
+
+def extract_media_type(data_url: str) -> tuple[str, str]:
+    """Extract media type and base64 data from a data URL.
 
     Args:
-        image_data_url: Base64 data URL (data:image/webp;base64,...)
-        context: Optional context about what the image represents
+        data_url: A data URL like "data:image/webp;base64,AAAA..."
 
     Returns:
-        Parsed JSON analysis result
+        Tuple of (media_type, base64_data)
 
     Raises:
-        ValueError: If API key is not configured
-        json.JSONDecodeError: If Claude returns non-JSON response
+        ValueError: If the URL has no "data:...," header
     """
-    client = get_client()
-    media_type, base64_data = extract_media_type(image_data_url)
+    # Only scan the header: the base64 payload after the comma can be megabytes.
+    comma = data_url.index(",", 0, _MAX_DATA_URL_HEADER)
+    colon = data_url.index(":", 0, comma)
+    end = data_url.find(";", colon + 1, comma)
+    if end == -1:
+        end = comma
+    return data_url[colon + 1:end], data_url[comma + 1:]
+
+
+def _build_request(media_type: str, base64_data: str | bytes, context: str) -> dict:
+    """Assemble the messages.stream keyword arguments for an image."""
+    if isinstance(base64_data, bytes):
+        base64_data = base64_data.decode("ascii")
 
     user_content = [
         {
@@ -80,19 +160,20 @@ def analyze_image(image_data_url: str, context: str = "") -> dict:
         },
     ]
 
-    prompt_text = "Analyze this image and return the structured JSON."
-    if context:
-        prompt_text = f"{context}\n\n{prompt_text}"
+    prompt_text = f"{context}\n\n{ANALYSIS_USER_PROMPT}" if context else ANALYSIS_USER_PROMPT
 
     user_content.append({"type": "text", "text": prompt_text})
 
-    message = client.messages.create(
-        model=VISION_MODEL,
-        max_tokens=MAX_TOKENS,
-        system=ANALYSIS_SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": user_content}],
-    )
+    return {
+        "model": VISION_MODEL,
+        "max_tokens": MAX_TOKENS,
+        "system": ANALYSIS_SYSTEM_PROMPT,
+        "messages": [{"role": "user", "content": user_content}],
+    }
 
+
+def _parse_response(message) -> dict:
+    """Extract and decode the JSON analysis from a Vision API message."""
     response_text = message.content[0].text
     logger.info(f"Vision API stop_reason={message.stop_reason}, response length={len(response_text)}")
 
@@ -100,11 +181,122 @@ def analyze_image(image_data_url: str, context: str = "") -> dict:
         raise ValueError("Vision API returned empty response")
 
     # Strip markdown code fences if the model wrapped its JSON output
-    cleaned = response_text.strip()
-    if cleaned.startswith("```"):
-        cleaned = cleaned.split("\n", 1)[1] if "\n" in cleaned else cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-        cleaned = cleaned.strip()
-
-    return json.loads(cleaned)
+    match = _FENCE_RE.match(response_text)
+    cleaned = (match.group(1) if match else response_text).strip()
+
+    return orjson.loads(cleaned)
+
+
+def analyze_image(image_data_url: str, context: str = "") -> dict:
+    """Send an image to Claude Vision for analysis.
+
+    Args:
+        image_data_url: Base64 data URL (data:image/webp;base64,...)
+        context: Optional context about what the image represents
+
+    Returns:
+        Parsed JSON analysis result
+
+    Raises:
+        ValueError: If API key is not configured
+        orjson.JSONDecodeError: If Claude returns non-JSON response
+            (a json.JSONDecodeError subclass)
+    """
+    media_type, base64_data = extract_media_type(image_data_url)
+    return analyze_image_bytes(media_type, base64_data, context)
+
+
+def analyze_image_bytes(media_type: str, base64_data: str | bytes, context: str = "") -> dict:
+    """Send an already-split base64 image payload to Claude Vision.
+
+    For callers that hold the encoded image in memory and would otherwise
+    wrap it in a data URL only to have it parsed apart again.
+
+    Args:
+        media_type: Image MIME type, e.g. "image/png"
+        base64_data: Base64-encoded image data
+        context: Optional context about what the image represents
+
+    Returns:
+        Parsed JSON analysis result
+
+    Raises:
+        ValueError: If API key is not configured
+        orjson.JSONDecodeError: If Claude returns non-JSON response
+            (a json.JSONDecodeError subclass)
+    """
+    key, cached = _cache_lookup(media_type, base64_data, context)
+    if cached is not None:
+        return cached
+
+    client = get_client()
+    with client.messages.stream(**_build_request(media_type, base64_data, context)) as stream:
+        message = stream.get_final_message()
+    return _cache_store(key, _parse_response(message))
+
+
+async def analyze_image_async(image_data_url: str, context: str = "") -> dict:
+    """Async variant of analyze_image for callers on the event loop.
+
+    Args:
+        image_data_url: Base64 data URL (data:image/webp;base64,...)
+        context: Optional context about what the image represents
+
+    Returns:
+        Parsed JSON analysis result
+
+    Raises:
+        ValueError: If API key is not configured
+        orjson.JSONDecodeError: If Claude returns non-JSON response
+            (a json.JSONDecodeError subclass)
+    """
+    media_type, base64_data = extract_media_type(image_data_url)
+    return await analyze_image_bytes_async(media_type, base64_data, context)
+
+
+async def analyze_image_bytes_async(
+    media_type: str, base64_data: str | bytes, context: str = ""
+) -> dict:
+    """Async variant of analyze_image_bytes for callers on the event loop.
+
+    Args:
+        media_type: Image MIME type, e.g. "image/png"
+        base64_data: Base64-encoded image data
+        context: Optional context about what the image represents
+
+    Returns:
+        Parsed JSON analysis result
+
+    Raises:
+        ValueError: If API key is not configured
+        orjson.JSONDecodeError: If Claude returns non-JSON response
+            (a json.JSONDecodeError subclass)
+    """
+    key, cached = _cache_lookup(media_type, base64_data, context)
+    if cached is not None:
+        return cached
+
+    client = get_async_client()
+    async with client.messages.stream(**_build_request(media_type, base64_data, context)) as stream:
+        message = await stream.get_final_message()
+    return _cache_store(key, _parse_response(message))
+
+
+async def analyze_images_batch(image_data_urls: list[str], context: str = "") -> list[dict]:
+    """Analyze several images concurrently over the shared async client.
+
+    Args:
+        image_data_urls: Base64 data URLs, one per image
+        context: Optional context applied to every image
+
+    Returns:
+        Parsed JSON analysis results, in the same order as the input
+
+    Raises:
+        ValueError: If API key is not configured
+        orjson.JSONDecodeError: If Claude returns non-JSON response for any image
+            (a json.JSONDecodeError subclass)
+    """
+    return list(await asyncio.gather(
+        *(analyze_image_async(url, context) for url in image_data_urls)
+    ))